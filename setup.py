@@ -1,27 +1,25 @@
 # Change to the directory containing this file and use the command
-# python3 setup.py sdist
-# to build a source distribution
+# python3 -m build
+# to build a source distribution and a py3-none-any wheel in dist/.
+# Publish both; pip installs the wheel by just unpacking it, without
+# running this file on the user's machine.
+#
+# The package metadata is in pyproject.toml, where pip can read it without
+# running any code. Only the build settings are left here.
 
-from distutils.core import setup
+from setuptools import setup
 
-# Use the readme file as the long description
-from os import path
-sunrise_sunset_directory = path.abspath(path.dirname(__file__))
-readme_file = open(path.join(sunrise_sunset_directory, 'README.md')) 
-readme = readme_file.read()
-
-setup(name='sunrise_sunset',
-      version = '1.2.1',
-      py_modules = ['sunrise_sunset'],
-      description='Calculates sunrise and sunset times based on date and location',
-      long_description=readme,
-      author='Paul Ivinson',
-      # author_email='unknown@example.com' - creates a warning but we'll ignore it.
-      url='https://github.com/Paul-Ivinson/sunrise_sunset',
-      #copyright='Copyright 2022 Paul Ivinson',
-      license='GPLv3',
-      #packages=['sunrise_sunset'],
-      scripts = ["sunrise_sunset.py"],
-      requires=["dateutil"]
-      #dependencies = ["dateutil"]
-)
+# Only do the work when run as a script (as pip and the build backends do)
+# and not when setup.py is merely imported to be inspected.
+if __name__ == "__main__":
+    # A single module with no data files - say so rather than have
+    # setuptools scan the source to work it out.
+    setup(zip_safe = True,
+          include_package_data = False,
+          # "setup.py install" byte-compiles as it installs, including the -OO
+          # (.opt-2.pyc) variant, so it doesn't have to happen on first import.
+          # Nothing is compiled at build time, as that would put bytecode for
+          # one interpreter in the py3-none-any wheel. pip compiles the
+          # normal .pyc itself when it installs the wheel.
+          options = {"install_lib": {"compile": True, "optimize": 2}},
+    )
@@ -27,7 +27,8 @@ optional arguments:
                         get messages as the other options are processed.
   -v, --verbose         Verbose - extra messages. Don't use -v and -q together
                         because the behaviour isn't defined.
-  --test                Run a basic test and exit.
+  --test                Run the unit tests and exit. They are in tests/ in
+                        the source and aren't installed by pip.
   --date Date           Date of sunrise & sunset in the format YYYYMMDD.
   --zenith Zenith       The zenith of the sun at sunrise and sunset.
 
@@ -50,23 +51,28 @@ import sys
 import argparse
 import datetime
 import time
-import re
 import math
-import unittest
+import functools
 
 # Additional modules
-# we could do the following 
-# import dateutil.tz
-# but it makes usage rather messy i.e.
-# dateutil.tz.tz.tzutc()
-from dateutil import tz
+#- None at this time. Times are returned in UTC using the standard
+#- library's datetime.timezone.utc rather than dateutil's tz.tzutc().
+
+# Optional modules
+# numpy is only needed to calculate a whole array of dates in one call,
+# see location.ss_calc_vector(). It takes longer to import than the rest
+# of this module put together, so that's left until the first such call.
+np = None
 
 #---- our own modules ---------------------------------#
 #- None at this time
 
 # Note the start time. Do this as soon as possible, even before the
 # various class and function definitions have been read.
-start_time = time.time()
+# perf_counter() is only good for measuring intervals, which is all the
+# messages need, but it is cheaper to read than the wall clock and never
+# goes backwards.
+start_time = time.perf_counter()
 
 #===============================================================#
 # Default values are here to allow this module to be imported.  #
@@ -75,105 +81,50 @@ verbose          = 1  # verbose = 1 gets you basic messages.
 debug            = False
 total_time       = 0.0
 
-#===============================================================#
-# define unit tests                                             #
-#===============================================================#
+# The start up messages, without their newlines. None of these change
+# while the program runs. __doc__ is None under python -OO.
+_BANNER     = (__doc__ or '').replace('\n', '')
+_PLATFORM   = sys.platform.replace('\n', '')
+_PY_VERSION = sys.version.replace('\n', '')
 
-class testcases(unittest.TestCase):
-    
-    def setup(self):
-        self.test_location = location(51.41416666, -1.515)
+# The algorithm works in degrees. Multiplying by these is what
+# math.radians() and math.degrees() do, without the function call.
+_D2R = math.pi / 180.0
+_R2D = 180.0 / math.pi
 
-    def test_valid_date(self):
-        self.date_given = valid_date("20221120")
-        self.assertIsInstance(self.date_given, datetime.date)
-            
-    def test_bad_date(self):
-        with self.assertRaises(argparse.ArgumentTypeError):
-            date_given = valid_date("2022-11-20")
+# The one UTC tzinfo object, shared by every time we return.
+_UTC = datetime.timezone.utc
+
+# The sun's zenith at sunrise and sunset in degrees - see help for values -
+# and its cosine, which is what ss_calc actually uses.
+_ZENITH_DEG = {"official":     90.0 + (50.0/60.0),
+               "civil":        96.0,
+               "nautical":     102.0,
+               "astronomical": 108.0}
+_ZENITH_COS = {zenith: math.cos(zenith_deg * _D2R) for zenith, zenith_deg in _ZENITH_DEG.items()}
+
+# The almanac's coefficients - ss_calc explains where they come from.
+# ss_calc, ss_calc_vector and _ss_calc_kernel all use these names so the
+# three versions of the calculation can't drift apart.
+_DEG_PER_DAY   = 360.0 / 365.2596358 # mean anomaly, step 3
+_M_OFFSET      = 3.289
+_ECC_AMP       = 1.916               # true longitude, step 4
+_OBL_AMP       = 0.020
+_ECL_OFFSET    = 282.634
+_RA_CORR       = 0.91764             # right ascension, step 5
+_SIN_DEC_COEFF = 0.39782             # declination, step 6
+_T_COEFF       = 0.06571             # local mean time, step 8
+_T_OFFSET      = 6.622
 
-    def test_good_latitude(self):
-        good_latitude = valid_latitude("51.41416666")
-        self.assertIsInstance(good_latitude, float)
-        
-    def test_bad_latitude(self):
-        with self.assertRaises(argparse.ArgumentTypeError):
-            bad_latitude = valid_latitude("95.00")
-            
-    def test_latitude_equator(self):
-        equator_latitude = valid_latitude("0.00")
-        self.assertIsInstance(equator_latitude, float)
-        self.assertEqual(equator_latitude, 0.00)
-            
-    def test_good_longitude(self):
-        good_longitude = valid_longitude("-1.515")
-        self.assertIsInstance(good_longitude, float)
-        
-    def test_bad_longitude(self):
-        with self.assertRaises(argparse.ArgumentTypeError):
-            bad_longitude = valid_longitude("189.00")            
-            
-    def test_sunrise_today(self):
-        "Test sunrise calcualtion for today"
-        
-        test_location = location(51.41416666, -1.515)
-        #date_given = valid_date("20221122")
-        date_today = datetime.date.today()
-        sun_rise = test_location.sunrise(date_today, "official")
-        self.assertIsInstance(sun_rise, datetime.date)
-        
-    def test_sunrise_22Nov2022(self):
-        "Test sunrise calculation for 22 Nov 2022"
-        test_location = location(51.41416666, -1.515)
-        date_given = valid_date("20221122")
-        sun_rise = test_location.sunrise(date_given, "official")        
-        self.assertIsInstance(sun_rise, datetime.date)
-        
-        # print(sun_rise)
-        
-        # local_hour = 7, local_minute = 34, local_second = 44
-        self.assertEqual(sun_rise.hour, 7)
-        self.assertEqual(sun_rise.minute, 34)
-        self.assertEqual(sun_rise.second, 44)
-        
-    def test_sunset_today(self):
-        "Test sunset calcualtion for today"
-        
-        test_location = location(51.41416666, -1.515)
-        #date_given = valid_date("20221122")
-        date_today = datetime.date.today()
-        sun_set = test_location.sunset(date_today, "official")
-        self.assertIsInstance(sun_set, datetime.date)
-        
-    def test_sunset_22Nov2022(self):
-        "Test sunset calculation for 22 Nov 2022"
-        test_location = location(51.41416666, -1.515)
-        date_given = valid_date("20221122")
-        sun_set = test_location.sunset(date_given, "official")        
-        self.assertIsInstance(sun_set, datetime.date)
-        
-        #print(sun_set)
-        
-        # local_hour = 16, local_minute = 8, local_second = 55
-        self.assertEqual(sun_set.hour, 16)
-        self.assertEqual(sun_set.minute, 8)
-        self.assertEqual(sun_set.second, 55)        
-
-def suite():
-
-    # Add tests manually  
-    #suite = unittest.TestSuite()
-    #suite.addTest(testcases('test_valid_latitude'))
-    
-    # or use test discovery 
-    suite = unittest.defaultTestLoader.loadTestsFromTestCase(testcases)
-    return suite
-    
 #===============================================================#
 # define Exceptions                                             #
 #===============================================================#
 
-# None so far
+class PolarNightError(ValueError):
+    "The sun never rises on this location on the date asked for."
+
+class PolarDayError(ValueError):
+    "The sun never sets on this location on the date asked for."
 
 #===============================================================#
 # define classes                                                #
@@ -183,9 +134,12 @@ class local_template:
 
     def __init__(self) -> None:
         self.verbose = 1
-        self.start_time = time.time()
+        # Share the module's start time so all the messages use the same clock.
+        self.start_time = start_time
+        # type(self) is the class actually being made, so subclasses get
+        # their own names without having to set them again.
         self.typename  = type(self).__name__
-        self.classname = str(__class__).split()[1].strip("'>")
+        self.classname = "%s.%s" % (type(self).__module__, self.typename)
 
     def message(self, verbosity, msg, classname = '',  method = ''):
         """ Local message handling method. """
@@ -195,12 +149,12 @@ class local_template:
             classname = self.classname
         #print "Verbosity = %s. self.verbose = %s" % (verbosity, self.verbose)
         if verbosity <= self.verbose:
-            print("---- %4.4f %s.%s - %s" % ((time.time()-self.start_time), classname, method, msg))
+            print("---- %4.4f %s.%s - %s" % ((time.perf_counter()-self.start_time), classname, method, msg))
         return
 
     def set_verbose(self, verbosity):
         "Set the amount of messages produced. Returns the setting in force at the time of the call."
-        this_function_name = sys._getframe(  ).f_code.co_name
+        this_function_name = 'set_verbose'
         old_verbosity = self.verbose
         self.verbose = verbosity
         classname = self.classname
@@ -209,19 +163,17 @@ class local_template:
           if verbosity > 0:
               # If we are being asked to be anything but quiet then print a message.
               own_msg = "set_verbose - Altering verbose from %s to %s" % (old_verbosity, self.verbose)
-              print("---- %4.4f %s.%s - %s" % ((time.time()-self.start_time), classname, this_function_name, own_msg))
+              print("---- %4.4f %s.%s - %s" % ((time.perf_counter()-self.start_time), classname, this_function_name, own_msg))
               
         return(old_verbosity)
 
     def push_verbose(self, verbosity):
         """Set verbose level but save the preceeding state to be re-instated later. Returns the setting in force at the time of the call."""
-        this_function_name = sys._getframe(  ).f_code.co_name
         self.verbose_stack.append(self.verbose)
         return(self.set_verbose(verbosity))
 
     def pop_verbose(self):
         """Returns the verbose level to the preceeding state. Returns the setting in force at the time of the call."""
-        this_function_name = sys._getframe(  ).f_code.co_name
         if len(self.verbose_stack) > 0: verbosity = self.verbose_stack.pop()
         else: verbosity = 0
         return(self.set_verbose(verbosity))
@@ -231,23 +183,45 @@ class location(local_template):
 
     def __init__(self, latitude, longitude, verbose=1) -> None:
         super().__init__()
-        # Got to be a better way to do this but I haven't found it yet.
-        this_function_name = sys._getframe(  ).f_code.co_name
-        # Override super().__init__ variables
-        self.typename  = type(self).__name__
-        self.classname = str(__class__).split()[1].strip("'>")
+        # The method name for messages. sys._getframe() would find it but
+        # is slow, so it's simply written out here and in the other methods.
+        this_function_name = '__init__'
         self.set_verbose(verbose)
         
         self.message(1, "location class constructor", method = this_function_name)
+        
+        assert type(latitude) == float
+        assert type(longitude) == float
+        
         self.latitude = latitude
         self.longitude = longitude
         self.zenith = 'official',
         
-        assert type(self.latitude) == float
-        assert type(self.longitude) == float
-        
         return  
         
+    @property
+    def latitude(self):
+        "Latitude in degrees. Setting it also works out its sine and cosine, which ss_calc needs every time."
+        return self._latitude
+    
+    @latitude.setter
+    def latitude(self, latitude):
+        self._latitude = latitude
+        self._sin_lat = math.sin(latitude * _D2R)
+        self._cos_lat = math.cos(latitude * _D2R)
+        
+    @property
+    def longitude(self):
+        "Longitude in degrees. Setting it also works out the longitude in hours, which ss_calc needs every time."
+        return self._longitude
+    
+    @longitude.setter
+    def longitude(self, longitude):
+        self._longitude = longitude
+        self._lng_hour = longitude / 15
+        
+    # The ss_ trig methods are kept for anyone calling them directly. ss_calc
+    # no longer uses them; it multiplies by _D2R / _R2D in line instead.
     def ss_sin(self, angle_360):
         "Returns the sine of an angle. Angle given in degrees."
         
@@ -292,27 +266,28 @@ class location(local_template):
         
         return(angle_360)
         
-    def ss_calc(self, date, zenith, rising):
+    def ss_calc(self, date, zenith, rising, refine=False):
         """ Calculate sunrise or sunset time for a given date.
             date: an instance of datetime.date
             zenith: string - see help for values
             rising: boolean - true for rising time, false for setting time
+            refine: boolean - redo steps 3 to 9 for the time found, rather
+                    than 06:00/18:00 local. Off by default so the times
+                    stay the same as they have always been.
         """
         
         #==== Convert zenith ============================================#
-        if zenith == "official":
-            zenith_deg = 90.0 + (50.0/60.0)
-        elif zenith == "civil":
-            zenith_deg = 96.0
-        elif zenith == "nautical":
-            zenith_deg = 102.0
-        elif zenith == "astronomical":    
-            zenith_deg = 108.0
+        if zenith in _ZENITH_DEG:
+            zenith_deg = _ZENITH_DEG[zenith]
+            cos_zenith = _ZENITH_COS[zenith]
         else:
+            zenith_deg = _ZENITH_DEG["official"]
+            cos_zenith = _ZENITH_COS["official"]
             zenith = "default (official)"
-            zenith_deg = 90.00 + (50.0/60.0)    
             
-        self.message(2, "Using zenith - %s = %.3f deg" % (zenith, zenith_deg), method='ss_calc')        
+        # Test verbose here rather than leave it to message() so the
+        # message isn't formatted only to be thrown away.
+        if self.verbose >= 2: self.message(2, "Using zenith - %s = %.3f deg" % (zenith, zenith_deg), method='ss_calc')
         
         # Set up a string for messages
         if rising:
@@ -327,18 +302,26 @@ class location(local_template):
         # N3 = (1 + floor((year - 4 * floor(year / 4) + 2) / 3))
         # N = N1 - (N2 * N3) + day - 30
         
-        # The range of N is 1 to 365
+        # The range of N is 1 to 366
         
-        N1 = math.floor((275 * date.month) / 9)
-        N2 = math.floor((date.month + 9) / 12)
-        N3 = (1 + math.floor((date.year - 4 * math.floor(date.year / 4) + 2) / 3))
-        N = N1 - (N2 * N3) + date.day - 30
+        # Python already knows the day of the year, and unlike the formula
+        # above it also gets the Gregorian leap years (1900, 2100) right.
+        N = date.timetuple().tm_yday
         
-        self.message(2, "Day of the year is %s" % N, method='ss_calc')
+        if self.verbose >= 2: self.message(2, "Day of the year is %s" % N, method='ss_calc')
         
-        # Alternative python way of calculating day of the year
-        # print("Day of the year = %s" % date.timetuple().tm_yday)
-        # N = date.timetuple().tm_yday
+        if self.verbose < 3:
+            # Nobody will see the step by step messages below so let
+            # _ss_calc_kernel() do steps 2 to 9 in one go, or reuse its
+            # answer if this calculation has been done before.
+            UTC, never = _ss_calc_cached(N, self._sin_lat, self._cos_lat, self._lng_hour, cos_zenith, rising, refine)
+            if never:
+                self.ss_never(never)
+            return self.ss_datetime(date, UTC)
+        
+        # Local names are quicker to look up than math.sin etc.
+        sin, cos, tan = math.sin, math.cos, math.tan
+        asin, acos, atan = math.asin, math.acos, math.atan
         
         #===============================================================#
         # 2. convert the longitude to hour value and calculate an approximate time
@@ -349,7 +332,8 @@ class location(local_template):
         # if setting time is desired:
         #     t = N + ((18 - lngHour) / 24)
         
-        lngHour = self.longitude / 15
+        # Worked out once when the longitude was set
+        lngHour = self._lng_hour
         
         # By definition the sun is overhead the Greenwich meridian at 12:00
         # So if we start a clock 12 hours earlier then, when viewed from the
@@ -390,7 +374,7 @@ class location(local_template):
         # It may be to compensate for the 9 days between the winter solstice
         # and the start of the year. 
         
-        mean_anomaly  = ((360 / 365.2596358) * t) - 3.289
+        mean_anomaly  = (_DEG_PER_DAY * t) - _M_OFFSET
         
         self.message(3, "Sun's mean anomaly = %s" % (mean_anomaly), method='ss_calc')
 
@@ -417,18 +401,15 @@ class location(local_template):
         # eccentricity_amplitude = 7.66 * 360.0  / (24.0 * 60.0 ) = 1.915
         # obliquity_amplitude = 9.87 * 360.0  / (24.0 * 60.0 ) = 2.4675
         
-        eccentricity_amplitude = 1.916 # Rounding up
-        obliquity_amplitude = 0.020   # Don't know why this is so small
+        eccentricity_amplitude = _ECC_AMP # 1.916 - Rounding up
+        obliquity_amplitude = _OBL_AMP   # 0.020 - Don't know why this is so small
         
         #print("eccentricity_amplitude = %s" % eccentricity_amplitude)
         #print("obliquity_amplitude = %s" % obliquity_amplitude)
         
-        sun_true_longitude =  mean_anomaly + (eccentricity_amplitude * self.ss_sin(mean_anomaly)) + (obliquity_amplitude * self.ss_sin(2 * mean_anomaly)) + 282.634
+        sun_true_longitude =  mean_anomaly + (eccentricity_amplitude * sin(mean_anomaly * _D2R)) + (obliquity_amplitude * sin(2 * mean_anomaly * _D2R)) + _ECL_OFFSET
         
-        if sun_true_longitude > 360.0:
-            sun_true_longitude = sun_true_longitude - 360.0
-        elif sun_true_longitude < 0.0:
-            sun_true_longitude = sun_true_longitude + 360.0
+        sun_true_longitude %= 360.0
             
         self.message(3, "Sun's true longitude (%s) = %s" % (rising_setting, sun_true_longitude), method='ss_calc')
         
@@ -437,12 +418,9 @@ class location(local_template):
         # RA = atan(0.91764 * tan(L))
         # NOTE: RA potentially needs to be adjusted into the range [0,360) by adding/subtracting 360
         
-        right_ascension = self.ss_atan(0.91764 * self.ss_tan(sun_true_longitude))
+        right_ascension = atan(_RA_CORR * tan(sun_true_longitude * _D2R)) * _R2D
             
-        if right_ascension > 360.0:
-            right_ascension = right_ascension - 360.0
-        elif right_ascension < 0.0:
-            right_ascension = right_ascension + 360.0
+        right_ascension %= 360.0
             
         self.message(3, "Sun's right ascension before quadrant calculation (%s) = %s" % (rising_setting, right_ascension), method='ss_calc')
         
@@ -471,8 +449,8 @@ class location(local_template):
         # sinDec = 0.39782 * sin(L)
         # cosDec = cos(asin(sinDec))
 
-        sinDec = 0.39782 * self.ss_sin(sun_true_longitude)   
-        cosDec = self.ss_cos(self.ss_asin(sinDec))
+        sinDec = _SIN_DEC_COEFF * sin(sun_true_longitude * _D2R)
+        cosDec = cos(asin(sinDec))
         
         self.message(3, "Sun's declination (%s) = %s, %s" % (rising_setting, sinDec, cosDec), method='ss_calc')
         
@@ -490,14 +468,15 @@ class location(local_template):
         # Sunset and sunrise occur (approximately) when the zenith angle is 90°
         # and that is when cos(hour_angle) = -tan(local_latitude)*tan(solar_declination)
         
-        cosH = (self.ss_cos(zenith_deg) - (sinDec * self.ss_sin(self.latitude))) / (cosDec * self.ss_cos(self.latitude))
+        cosH = (cos_zenith - (sinDec * self._sin_lat)) / (cosDec * self._cos_lat)
         
         self.message(3, "Sun's local hour angle (%s) = %s" % (rising_setting, cosH), method='ss_calc')
         
+        # There is nothing more to work out if the sun doesn't rise or set.
         if cosH >  1.0:
-            self.message(1, "The sun never rises on this location (on the specified date).", method='ss_calc')
+            self.ss_never(1)
         if cosH < -1.0:
-            self.message(1, "The sun never sets on this location (on the specified date).", method='ss_calc')
+            self.ss_never(-1)
             
         #===============================================================#
         # 7b. finish calculating H and convert into hours
@@ -509,9 +488,9 @@ class location(local_template):
         # H = H / 15
         
         if rising:
-            hour_angle = 360 - self.ss_acos(cosH)
+            hour_angle = 360 - acos(cosH) * _R2D
         else:
-            hour_angle = self.ss_acos(cosH)
+            hour_angle = acos(cosH) * _R2D
         
         #print(cosH)
         
@@ -523,7 +502,7 @@ class location(local_template):
         #8. calculate local mean time of rising/setting
         # T = H + RA - (0.06571 * t) - 6.622
         
-        local_mean_time = hour + right_ascension_hours - (0.06571 * t) - 6.622
+        local_mean_time = hour + right_ascension_hours - (_T_COEFF * t) - _T_OFFSET
         
         self.message(3, "Local mean time (%s) = %s" % (rising_setting, local_mean_time), method='ss_calc')
         
@@ -534,74 +513,238 @@ class location(local_template):
         
         UTC = local_mean_time - lngHour
         
-        if UTC > 24.0:
-            UTC = UTC - 24.0
-        elif UTC < 0.0:
-            UTC = UTC + 24.0
+        UTC %= 24.0
         
         if rising:
             self.message(3, "Rising time (UTC) = %s" % UTC, method='ss_calc')
         else:
             self.message(3, "Setting time (UTC) = %s" % UTC, method='ss_calc')
+        
+        #===============================================================#
+        # Optionally refine the time.
+        # Steps 3 to 9 used the sun's position at t, 06:00 or 18:00 local
+        # time, but it has moved on a little by the time it actually
+        # rises or sets. Doing the steps again for the time just found
+        # uses the sun's position at that time instead.
+        
+        if refine:
+            UTC, never = _ss_calc_kernel(N, self._sin_lat, self._cos_lat, self._lng_hour, cos_zenith, rising, refine)
+            if never:
+                self.ss_never(never)
+            self.message(3, "Refined %s time (UTC) = %s" % (rising_setting, UTC), method='ss_calc')
+
+        return self.ss_datetime(date, UTC)
 
+    def ss_never(self, never):
+        """ Raise the exception for a date on which the sun doesn't rise or set.
+            never: int - 1 if the sun never rises, -1 if it never sets
+        """
+        
+        if never > 0:
+            raise PolarNightError("The sun never rises on this location (on the specified date).")
+        raise PolarDayError("The sun never sets on this location (on the specified date).")
+
+    def ss_datetime(self, date, UTC):
+        """ Step 10 of ss_calc. Returns the time UTC on date as a datetime.datetime
+            date: an instance of datetime.date
+            UTC: float - hours since midnight UTC
+        """
+        
         #10. convert UT value to local time zone of latitude/longitude
         # localT = UT + localOffset
         
-        local_hour = int(UTC) 
-        local_minute_dec = UTC - local_hour
-        local_minute = int(local_minute_dec * 60.0)
-        local_second_dec = UTC - local_hour - (local_minute / 60.0)
-        local_second = int(local_second_dec * 3600.0)
+        # Split into hours, minutes and seconds in whole microseconds, so it's
+        # exact integer arithmetic. A time that rounds up to 24:00 wraps to
+        # 00:00, as UTC itself does in step 9.
+        total_microseconds = round(UTC * 3600000000.0) % 86400000000
+        local_second, local_microsecond = divmod(total_microseconds, 1000000)
+        local_minute, local_second = divmod(local_second, 60)
+        local_hour, local_minute = divmod(local_minute, 60)
         
-        self.message(2, "local_hour = %s, local_minute = %s, local_second = %s" % (local_hour, local_minute, local_second), method='ss_calc')
+        if self.verbose >= 2: self.message(2, "local_hour = %s, local_minute = %s, local_second = %s" % (local_hour, local_minute, local_second), method='ss_calc')
         
         year = date.year 
         month = date.month
         day = date.day
         
-        return datetime.datetime(year, month, day, hour=local_hour, minute=local_minute, second=local_second, tzinfo=tz.tzutc())
+        return datetime.datetime(year, month, day, hour=local_hour, minute=local_minute, second=local_second, microsecond=local_microsecond, tzinfo=_UTC)
 
-    def sunrise(self, date, zenith):
+    def ss_calc_vector(self, dates, zenith, rising, refine=False):
+        """ Calculate sunrise or sunset times for many dates in one go.
+            dates: a sequence of datetime.date, a numpy datetime64 array or
+                   a single numpy.datetime64
+            zenith: string - see help for values
+            rising: boolean - true for rising time, false for setting time
+            refine: boolean - see ss_calc
+            
+            Needs numpy. The steps are the same as ss_calc but each one is
+            done for the whole array at once rather than date by date.
+            Returns a list of datetime.datetime, with None for any date on
+            which the sun doesn't rise or set.
+        """
+        
+        global np
+        if np is None:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError("ss_calc_vector needs numpy, which isn't installed.") from None
+        
+        zenith_deg = _ZENITH_DEG.get(zenith, _ZENITH_DEG["official"])
+        cos_zenith = _ZENITH_COS.get(zenith, _ZENITH_COS["official"])
+        
+        # atleast_1d so a single numpy.datetime64 comes back as a list of one
+        dates = np.atleast_1d(np.asarray(dates, dtype='datetime64[D]'))
+        
+        if self.verbose >= 2: self.message(2, "Calculating %s dates using zenith %.3f deg" % (dates.size, zenith_deg), method='ss_calc_vector')
+        
+        # 1. day of the year - days since the 1st of January, plus one
+        N = (dates - dates.astype('datetime64[Y]')).astype(int) + 1
+        
+        # 2. approximate time
+        lngHour = self._lng_hour
+        approx_UTC = np.where(rising, 6.0, 18.0) - lngHour
+        t = N + (approx_UTC / 24)
+        
+        no_event = False
+        for i in range(2 if refine else 1):
+            if i > 0:
+                # Start again from the time just found, as _ss_calc_kernel does
+                t = N + ((approx_UTC + np.mod(UTC - approx_UTC + 12.0, 24.0) - 12.0) / 24)
+            
+            # 3. Sun's mean anomaly
+            mean_anomaly = (_DEG_PER_DAY * t) - _M_OFFSET
+        
+            # 4. Sun's true longitude
+            sun_true_longitude = mean_anomaly + (_ECC_AMP * np.sin(np.radians(mean_anomaly))) + (_OBL_AMP * np.sin(np.radians(2 * mean_anomaly))) + _ECL_OFFSET
+            sun_true_longitude = np.mod(sun_true_longitude, 360.0)
+        
+            # 5. Sun's right ascension, in the same quadrant as L and in hours
+            right_ascension = np.degrees(np.arctan(_RA_CORR * np.tan(np.radians(sun_true_longitude))))
+            right_ascension = np.mod(right_ascension, 360.0)
+            Lquadrant  = (np.floor( sun_true_longitude / 90.0)) * 90.0
+            RAquadrant = (np.floor(right_ascension / 90.0)) * 90.0
+            right_ascension_hours = (right_ascension + (Lquadrant - RAquadrant)) / 15.0
+        
+            # 6. Sun's declination
+            sinDec = _SIN_DEC_COEFF * np.sin(np.radians(sun_true_longitude))
+            cosDec = np.cos(np.arcsin(sinDec))
+        
+            # 7. Sun's local hour angle. Outside [-1, 1] the sun never rises
+            # (> 1) or never sets (< -1); clip so arccos stays defined and
+            # drop those dates at the end.
+            cosH = (cos_zenith - (sinDec * self._sin_lat)) / (cosDec * self._cos_lat)
+            no_event = no_event | (cosH > 1.0) | (cosH < -1.0)
+            hour_angle = np.degrees(np.arccos(np.clip(cosH, -1.0, 1.0)))
+            hour = np.where(rising, 360 - hour_angle, hour_angle) / 15.0
+        
+            # 8. local mean time of rising/setting
+            local_mean_time = hour + right_ascension_hours - (_T_COEFF * t) - _T_OFFSET
+        
+            # 9. adjust back to UTC
+            UTC = local_mean_time - lngHour
+            UTC = np.mod(UTC, 24.0)
+        
+        # 10. split into hours, minutes and seconds as ss_datetime does
+        total_microseconds = np.round(UTC * 3600000000.0).astype(np.int64) % 86400000000
+        local_second, local_microsecond = np.divmod(total_microseconds, 1000000)
+        local_minute, local_second = np.divmod(local_second, 60)
+        local_hour, local_minute = np.divmod(local_minute, 60)
+        
+        times = []
+        for i in range(dates.size):
+            if no_event[i]:
+                times.append(None)
+            else:
+                day = dates[i].item()
+                times.append(datetime.datetime(day.year, day.month, day.day, hour=int(local_hour[i]), minute=int(local_minute[i]), second=int(local_second[i]), microsecond=int(local_microsecond[i]), tzinfo=_UTC))
+        
+        return times
+
+    def sunrise(self, date, zenith, refine=False):
         """ Calculate sunrise for a given date.
-            date: an instance of datetime.date
+            date: an instance of datetime.date, or a sequence of them (needs numpy)
             zenith: string - see help for values
+            refine: boolean - see ss_calc
+            Returns a datetime.datetime, or for a sequence a list of them.
+            If the sun doesn't rise or set on the date this raises
+            PolarNightError or PolarDayError, but in a list it is just None.
         """
         
-        this_function_name = sys._getframe(  ).f_code.co_name
-        self.message(1, "sunrise method called", method = this_function_name)
+        this_function_name = 'sunrise'
+        if self.verbose >= 1: self.message(1, "sunrise method called", method = this_function_name)
+        
+        if not isinstance(date, datetime.date):
+            return self.ss_calc_vector(date, zenith, True, refine)
         
-        sunrise_time = self.ss_calc(date, zenith, True)
+        sunrise_time = self.ss_calc(date, zenith, True, refine)
         
-        self.message(1, "Sunrise is %i:%02i:%02i" % (sunrise_time.hour, sunrise_time.minute, sunrise_time.second), method = this_function_name)
+        if self.verbose >= 1: self.message(1, "Sunrise is %i:%02i:%02i" % (sunrise_time.hour, sunrise_time.minute, sunrise_time.second), method = this_function_name)
         
         return sunrise_time
         
-    def sunset(self, date, zenith):
+    def sunset(self, date, zenith, refine=False):
         """ Calculate sunset time for a given date.
-            date: an instance of datetime.date
+            date: an instance of datetime.date, or a sequence of them (needs numpy)
             zenith: string - see help for values
+            refine: boolean - see ss_calc
+            Returns a datetime.datetime, or for a sequence a list of them.
+            If the sun doesn't rise or set on the date this raises
+            PolarNightError or PolarDayError, but in a list it is just None.
         """
                 
-        this_function_name = sys._getframe(  ).f_code.co_name
-        self.message(1, "sunset method called", method = this_function_name)                
+        this_function_name = 'sunset'
+        if self.verbose >= 1: self.message(1, "sunset method called", method = this_function_name)
         
-        sunset_time = self.ss_calc(date, zenith, False)
+        if not isinstance(date, datetime.date):
+            return self.ss_calc_vector(date, zenith, False, refine)
         
-        self.message(1, "Sunset is %i:%02i:%02i" % (sunset_time.hour, sunset_time.minute, sunset_time.second), method = this_function_name)
+        sunset_time = self.ss_calc(date, zenith, False, refine)
+        
+        if self.verbose >= 1: self.message(1, "Sunset is %i:%02i:%02i" % (sunset_time.hour, sunset_time.minute, sunset_time.second), method = this_function_name)
         
         return sunset_time
         
+    def sun_events(self, date, zenith, refine=False):
+        """ Calculate sunrise and sunset for a given date in one call.
+            date: an instance of datetime.date, or a sequence of them (needs numpy)
+            zenith: string - see help for values
+            refine: boolean - see ss_calc
+            Returns (sunrise, sunset), or for a sequence a list of each.
+            If the sun doesn't rise or set on the date this raises
+            PolarNightError or PolarDayError, but in the lists it is just None.
+        """
+        
+        this_function_name = 'sun_events'
+        if self.verbose >= 1: self.message(1, "sun_events method called", method = this_function_name)
+        
+        if not isinstance(date, datetime.date):
+            return self.ss_calc_vector(date, zenith, True, refine), self.ss_calc_vector(date, zenith, False, refine)
+        
+        # The algorithm starts sunrise from 06:00 and sunset from 18:00, so
+        # they can't share their intermediate values without changing the
+        # answers. Both still come from the same cached kernel.
+        sunrise_time = self.ss_calc(date, zenith, True, refine)
+        sunset_time = self.ss_calc(date, zenith, False, refine)
+        
+        if self.verbose >= 1: self.message(1, "Sunrise is %i:%02i:%02i, sunset is %i:%02i:%02i" % (sunrise_time.hour, sunrise_time.minute, sunrise_time.second, sunset_time.hour, sunset_time.minute, sunset_time.second), method = this_function_name)
+        
+        return sunrise_time, sunset_time
+        
 #===============================================================#
 # define functions                                              #
 #===============================================================#
 # Utility functions ============================================#
 def message(verbosity, msg, module=__name__):
     global verbose, start_time
+    if verbosity > verbose:
+        # Not wanted at this level, so don't read the clock or format anything.
+        return
     if verbosity == 0 and verbose == 0:
         # Cleaner messages when in quiet mode
         print(msg)
-    elif verbosity <= verbose:
-        print("---- %4.4f %s - %s" % ((time.time()-start_time), module, msg))
+    else:
+        print("---- %4.4f %s - %s" % ((time.perf_counter()-start_time), module, msg))
     return
 
 def is_number(s):
@@ -623,6 +766,9 @@ def is_integer(s):
         return False
 
 #==== Used by the argument parsing =====================================
+# datetime.date is immutable so the same one can be handed out for the
+# same string. Errors aren't cached; they are raised again each time.
+@functools.lru_cache(maxsize=128)
 def valid_date(date_str):
     "Validates a date in the format YYYYMMDD, Returns a datetime.date object"
 
@@ -631,34 +777,31 @@ def valid_date(date_str):
         msg = 'valid_date - Error validating date. Wrong number of characters. Date="%s"' % date_str
         raise argparse.ArgumentTypeError(msg)
 
-    # is the supplied date all digits?
-    if not is_integer(date_str):
+    # is the supplied date all digits? strptime on its own would let
+    # spaces through e.g. "202211 1"
+    if not date_str.isdigit():
         msg = 'valid_date - Error validating date. Format not YYYYMMDD Date="%s"' % date_str
         raise argparse.ArgumentTypeError(msg)
 
-    year  = int(date_str[:4])
-    month = int(date_str[4:6])
-    day   = int(date_str[6:8])
-    #print('year = ', year, 'month = ', month, 'day = ', day)
-
+    # is it a real date? One parse gets the year, month and day and checks them.
     try:
-        date_obj = datetime.date(year, month, day)
-    except ValueError:
-        msg = "valid_date - Error validating date. Value error. Year = '%s', Month = '%s', Day = '%s'" % (year, month, day)
-        raise argparse.ArgumentTypeError(msg)
+        date_obj = datetime.datetime.strptime(date_str, "%Y%m%d").date()
+    except ValueError as e:
+        msg = 'valid_date - Error validating date. Value error. Date="%s"' % date_str
+        raise argparse.ArgumentTypeError(msg) from e
 
     return(date_obj)
     
 def valid_latitude(latitude):
     "Latitude is given as an angle that ranges from -90° at the south pole to 90deg at the north pole, with 0° at the Equator. Note: returns a float."
     
-    if not is_number(latitude):
+    try:
+        latitude_float = float(latitude)
+    except (ValueError, TypeError):
         msg = 'valid_latitude - Error validating latitude. Latitude must be a number.'
         raise argparse.ArgumentTypeError(msg)
-        
-    latitude_float = float(latitude)
     
-    if not (latitude_float <= 90.0 and latitude_float >=-90.0) :
+    if not -90.0 <= latitude_float <= 90.0:
         msg = 'valid_latitude - Error validating latitude. Latitude is a given as an angle that ranges from -90deg at the south pole to 90deg at the north pole, with 0deg at the Equator.'
         raise argparse.ArgumentTypeError(msg)
         
@@ -667,13 +810,13 @@ def valid_latitude(latitude):
 def valid_longitude(longitude):
     "Longitude is given as an angle which is positive for East and negative for West. Note: returns a float."
     
-    if not is_number(longitude):
+    try:
+        longitude_float = float(longitude)
+    except (ValueError, TypeError):
         msg = 'valid_longitude - Error validating longitude. longitude must be a number.'
         raise argparse.ArgumentTypeError(msg)
     
-    longitude_float = float(longitude)
-    
-    if not (longitude_float <= 180.0 and longitude_float >= -180.0):
+    if not -180.0 <= longitude_float <= 180.0:
         msg = 'valid_longitude - Error validating longitude. longitude is a given as an angle which is positive for East and negative for West.'
         raise argparse.ArgumentTypeError(msg)
         
@@ -700,19 +843,111 @@ def print_there(x, y, text):
 # processing finctions                                          #
 #===============================================================#
 
-# None so far
+def _ss_calc_kernel(N, sin_lat, cos_lat, lng_hour, cos_zenith, rising, refine=False):
+    """ Steps 2 to 9 of location.ss_calc as plain arithmetic, without the messages.
+        N: int - day of the year
+        sin_lat, cos_lat: float - sine and cosine of the latitude
+        lng_hour: float - longitude in hours, i.e. degrees / 15
+        cos_zenith: float - cosine of the zenith
+        rising: boolean - true for rising time, false for setting time
+        refine: boolean - do steps 3 to 9 a second time, for the time found
+                by the first pass rather than 06:00/18:00 local
+        Returns (UTC, never). UTC is the time in hours. never is 1 if the sun
+        never rises and -1 if it never sets (UTC is then nan), otherwise 0.
+        See ss_calc for what each step does.
+        
+        There are three copies of steps 2 to 9, kept on purpose:
+          ss_calc, at verbose 3 or more, explains and prints each step.
+          This function is the one normally used. It has no messages, so
+          it does nothing but the arithmetic.
+          ss_calc_vector does the same sums on numpy arrays.
+        Having ss_calc print this function's intermediate values would
+        mean a check for messages at every step here, which is paid on
+        every calculation. It would also mean moving ss_calc's notes on
+        the almanac away from the steps they explain. All three take their
+        coefficients from the module constants above, and
+        test_step_by_step_matches and test_vector_matches_scalar check
+        they give the same times.
+    """
+    
+    # Local names are quicker to look up than math.sin etc.
+    sin, cos, tan = math.sin, math.cos, math.tan
+    asin, acos, atan = math.asin, math.acos, math.atan
+    
+    # 2. approximate time
+    lngHour = lng_hour
+    if rising:
+        approx_UTC = 6 - lngHour
+    else:
+        approx_UTC = 18 - lngHour
+    t = N + (approx_UTC / 24)
+    
+    UTC = math.nan
+    for i in range(2 if refine else 1):
+        if i > 0:
+            # Start again from the time just found. UTC is in [0, 24) but
+            # approx_UTC needn't be, so step from approx_UTC by the
+            # difference, taken the short way round the clock.
+            t = N + ((approx_UTC + ((UTC - approx_UTC + 12.0) % 24.0) - 12.0) / 24)
+        
+        # 3. Sun's mean anomaly
+        mean_anomaly = (_DEG_PER_DAY * t) - _M_OFFSET
+        
+        # 4. Sun's true longitude
+        sun_true_longitude = mean_anomaly + (_ECC_AMP * sin(mean_anomaly * _D2R)) + (_OBL_AMP * sin(2 * mean_anomaly * _D2R)) + _ECL_OFFSET
+        sun_true_longitude %= 360.0
+        
+        # 5. Sun's right ascension, in the same quadrant as L and in hours
+        right_ascension = atan(_RA_CORR * tan(sun_true_longitude * _D2R)) * _R2D
+        right_ascension %= 360.0
+        Lquadrant  = (math.floor( sun_true_longitude / 90.0)) * 90.0
+        RAquadrant = (math.floor(right_ascension / 90.0)) * 90.0
+        right_ascension_hours = (right_ascension + (Lquadrant - RAquadrant)) / 15.0
+        
+        # 6. Sun's declination
+        sinDec = _SIN_DEC_COEFF * sin(sun_true_longitude * _D2R)
+        cosDec = cos(asin(sinDec))
+        
+        # 7. Sun's local hour angle
+        cosH = (cos_zenith - (sinDec * sin_lat)) / (cosDec * cos_lat)
+        if cosH > 1.0:
+            return math.nan, 1
+        if cosH < -1.0:
+            return math.nan, -1
+        if rising:
+            hour_angle = 360 - acos(cosH) * _R2D
+        else:
+            hour_angle = acos(cosH) * _R2D
+        hour = hour_angle / 15.0
+        
+        # 8. local mean time of rising/setting
+        local_mean_time = hour + right_ascension_hours - (_T_COEFF * t) - _T_OFFSET
+        
+        # 9. adjust back to UTC
+        UTC = local_mean_time - lngHour
+        UTC %= 24.0
+    
+    return UTC, 0
+
+@functools.lru_cache(maxsize=4096)
+def _ss_calc_cached(N, sin_lat, cos_lat, lng_hour, cos_zenith, rising, refine=False):
+    """ _ss_calc_kernel with its results remembered.
+        The answer only depends on the day of the year, not the year, so
+        asking again for the same place and day is a dictionary lookup.
+        This is a function rather than a location method so the cache
+        doesn't keep location instances alive.
+    """
+    return _ss_calc_kernel(N, sin_lat, cos_lat, lng_hour, cos_zenith, rising, refine)
 
 #===============================================================#
-# define main()                                                 #
+# define the argument parser                                    #
 #===============================================================#
-def main():
-    global verbose
+# Built the first time it is needed and then kept, so calling main()
+# again, e.g. from another script, doesn't set it all up again.
+@functools.lru_cache(maxsize=None)
+def make_parser():
+    "Returns the ArgumentParser for the command line options."
 
-    opt_test = False
-
-    #==================================================================#
-    # Parse arguments                                                  #
-    #==================================================================#
     parser = argparse.ArgumentParser(
         description=__doc__,
         # Take control of the formatting of the epilog
@@ -731,6 +966,14 @@ def main():
         """,
         add_help=True)
 
+    if sys.version_info >= (3, 14):
+        # From Python 3.14 each add_argument() makes HelpFormatters just to
+        # check the argument, and each one reads the environment to decide
+        # on colour. Let them all share one formatter while the arguments
+        # are added.
+        formatter = parser._get_formatter()
+        parser._get_formatter = lambda: formatter
+
     # First argument to be processed is ..
     parser.add_argument('-q',              dest='verbose',  action='store_const', const=0, default=1, help="Quiet - absolutely no messages. Useful from the command line. Make this the first option or you will get messages as the other options are processed.")
     
@@ -743,42 +986,56 @@ def main():
 
     # Optional args
     parser.add_argument('-v', '--verbose', dest='verbose',  action='count',                default=1, help="Verbose - extra messages. Don't use -v and -q together because the behaviour isn't defined.")
-    parser.add_argument('--test',          dest='opt_test', action='store_true',                      help="Run a basic test and exit.")
+    parser.add_argument('--test',          dest='opt_test', action='store_true',                      help="Run the unit tests and exit. They are in tests/ in the source and aren't installed by pip.")
     parser.add_argument('--date',          dest='Date',     metavar='Date', type=valid_date, help='Date of sunrise & sunset in the format YYYYMMDD.')
     parser.add_argument('--zenith',        dest='Zenith',   metavar='Zenith', choices=['official', 'civil', 'nautical', 'astronomical'], default='official', help='The zenith of the sun at sunrise and sunset.')
 
+    if sys.version_info >= (3, 14):
+        # Back to a fresh formatter each time, which --help and the error
+        # messages rely on.
+        del parser._get_formatter
+
+    return(parser)
+
+#===============================================================#
+# define main()                                                 #
+#===============================================================#
+def main(argv=None):
+    """ Run from the command line.
+        argv: list of option strings - defaults to sys.argv[1:]
+    """
+    global verbose
+
+    #==================================================================#
+    # Parse arguments                                                  #
+    #==================================================================#
+    parser = make_parser()
+
     this_script = os.path.basename(sys.argv[0])
 
-    args = vars(parser.parse_args())
-
-    for key in args.keys():
-        o = key
-        a = args[key]
-        # Standard options
-        if o == 'v': verbose = a
-        if o == 'q': verbose = 0
-        #if o == 'h': usage()
-        #if o == 'help': usage()
-        if o == 'verbose': verbose = a
-        # Now print the option - if -q then message will be suppressed
-        message (1, 'Option %s = %s' %(o,a))
-        if o == 'opt_test': opt_test = a
-        # Options specific to this script
-        if o == 'Date': date_given = a
-        if o == 'Latitude': latitude = a
-        if o == 'Longitude': longitude = a
-        if o == 'Zenith': zenith = a
-        
-    message(1, "%s" % re.sub(r'\n', '', __doc__))
+    args = vars(parser.parse_args(argv))
+
+    # -q and -v both store to verbose, so argparse has already settled
+    # which of them wins.
+    verbose    = args['verbose']
+    opt_test   = args['opt_test']
+    date_given = args['Date']
+    latitude   = args['Latitude']
+    longitude  = args['Longitude']
+    zenith     = args['Zenith']
+    # Print the options - if -q then message will be suppressed
+    message(1, 'Options: %r' % args)
+        
+    message(1, _BANNER)
     message(1, "Started %s" % time.strftime("%a, %d %b %Y %H:%M:%S"))
-    message(1, "Python interpreter running on %s" % re.sub(r'\n', '', sys.platform))
-    message(1, "Interpreter version = %s" % re.sub(r'\n', '', sys.version))
+    message(1, "Python interpreter running on %s" % _PLATFORM)
+    message(1, "Interpreter version = %s" % _PY_VERSION)
     message(1, "Invoked via %s" % sys.argv[0])        
         
-    if sys.platform.lower()[0:5] == 'linux':
+    # sys.platform is always lower case e.g. 'linux', 'cygwin', 'win32'
+    if sys.platform.startswith('linux'):
         message(1, '%s - Running on Linux.' % this_script)
-
-    if sys.platform.lower()[0:6] == 'cygwin':
+    elif sys.platform.startswith('cygwin'):
         message(1, '%s - Running on Cygwin.' % this_script)
 
     message(1,'%s - Verbose level = %s' % (this_script, verbose))
@@ -787,46 +1044,46 @@ def main():
     #===============================================================#
     # Start work                                                    #
     #===============================================================#
-    # Preserve the incoming argv set
-    master_argv = sys.argv
-
     #=== TEST ======================================================#
     if opt_test:
         if verbose == 0:
           verbose = 1
         message(1, "running tests")
+        # The tests are in tests/test_sunrise_sunset.py. unittest is only
+        # imported here so that using the module doesn't pay for it.
+        import unittest
+        try:
+            from tests import test_sunrise_sunset
+        except ImportError:
+            # pip installs only this module, not tests/
+            message(0, "The tests aren't installed. Run --test from a copy of the source, which has them in tests/.")
+            return(5)
         runner = unittest.TextTestRunner()
-        runner.run(suite())
+        result = runner.run(unittest.defaultTestLoader.loadTestsFromModule(test_sunrise_sunset))
+        if not result.wasSuccessful():
+            return(1)
 
     else:
-        if not date_given:
-            # message(0, "Date is required")
-            # return(4)
+        if date_given is None:
             date_given = datetime.date.today()
-        elif not latitude: 
+        # 0.0 is a valid latitude or longitude, so test for None.
+        if latitude is None:
             message(0, "Latitude is required")
             return(4)
-        elif not longitude:
+        if longitude is None:
             message(0, "Longitude is required")
             return(4)
         
         new_place = location(latitude, longitude, verbose)
-        sun_rise = new_place.sunrise(date_given, zenith)
-        sun_set = new_place.sunset(date_given, zenith)
+        try:
+            sun_rise = new_place.sunrise(date_given, zenith)
+            sun_set = new_place.sunset(date_given, zenith)
+        except (PolarNightError, PolarDayError) as e:
+            message(0, str(e))
         
     message(1, "Finished!")
     return(errors)
 
-#=====================================================================#
-# Help text and utilities                                             #
-#=====================================================================#
-
-def usage(*args):
-    sys.stdout = sys.stderr
-    for msg in args: print(msg)
-    print(__doc__)
-    sys.exit(2)
-
 #=====================================================================#
 #                      Main program                                   #
 #=====================================================================#
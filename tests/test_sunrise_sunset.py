@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  test_sunrise_sunset.py
+#
+#  Copyright 2022 Paul Ivinson <paivinson@gmail.com>
+#
+"""Unit tests for sunrise_sunset.
+
+Run them with
+    python3 -m unittest
+from the top of the project, or with
+    python3 sunrise_sunset.py --test
+"""
+
+# Built-in Python modules
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import math
+import os
+import subprocess
+import sys
+import unittest
+
+#---- our own modules ---------------------------------#
+from sunrise_sunset import location, valid_date, valid_latitude, valid_longitude, PolarNightError, PolarDayError
+
+#===============================================================#
+# define unit tests                                             #
+#===============================================================#
+
+class testcases(unittest.TestCase):
+    
+    def setup(self):
+        self.test_location = location(51.41416666, -1.515)
+
+    def test_import_is_light(self):
+        "Test importing sunrise_sunset doesn't load numpy"
+        # In a fresh interpreter, as this one may have loaded numpy already
+        top = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        loaded = subprocess.run([sys.executable, "-c", "import sys, sunrise_sunset; print('numpy' in sys.modules)"],
+                                cwd=top, capture_output=True, text=True, check=True).stdout.strip()
+        self.assertEqual(loaded, "False")
+
+    def test_valid_date(self):
+        self.date_given = valid_date("20221120")
+        self.assertIsInstance(self.date_given, datetime.date)
+            
+    def test_bad_date(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            date_given = valid_date("2022-11-20")
+
+    def test_good_latitude(self):
+        good_latitude = valid_latitude("51.41416666")
+        self.assertIsInstance(good_latitude, float)
+        
+    def test_bad_latitude(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            bad_latitude = valid_latitude("95.00")
+            
+    def test_latitude_equator(self):
+        equator_latitude = valid_latitude("0.00")
+        self.assertIsInstance(equator_latitude, float)
+        self.assertEqual(equator_latitude, 0.00)
+            
+    def test_good_longitude(self):
+        good_longitude = valid_longitude("-1.515")
+        self.assertIsInstance(good_longitude, float)
+        
+    def test_bad_longitude(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            bad_longitude = valid_longitude("189.00")            
+            
+    def test_location_precomputes(self):
+        "Test location works out the values ss_calc needs when the latitude and longitude are set"
+        test_location = location(51.41416666, -1.515)
+        self.assertAlmostEqual(test_location._sin_lat, math.sin(math.radians(51.41416666)))
+        self.assertAlmostEqual(test_location._cos_lat, math.cos(math.radians(51.41416666)))
+        self.assertAlmostEqual(test_location._lng_hour, -1.515 / 15)
+        test_location.longitude = 15.0
+        self.assertAlmostEqual(test_location._lng_hour, 1.0)
+
+    def test_sunrise_today(self):
+        "Test sunrise calcualtion for today"
+        
+        test_location = location(51.41416666, -1.515)
+        #date_given = valid_date("20221122")
+        date_today = datetime.date.today()
+        sun_rise = test_location.sunrise(date_today, "official")
+        self.assertIsInstance(sun_rise, datetime.date)
+        
+    def test_sunrise_22Nov2022(self):
+        "Test sunrise calculation for 22 Nov 2022"
+        test_location = location(51.41416666, -1.515)
+        date_given = valid_date("20221122")
+        sun_rise = test_location.sunrise(date_given, "official")        
+        self.assertIsInstance(sun_rise, datetime.date)
+        
+        # print(sun_rise)
+        
+        # local_hour = 7, local_minute = 34, local_second = 44
+        self.assertEqual(sun_rise.hour, 7)
+        self.assertEqual(sun_rise.minute, 34)
+        self.assertEqual(sun_rise.second, 44)
+        
+    def test_sunset_today(self):
+        "Test sunset calcualtion for today"
+        
+        test_location = location(51.41416666, -1.515)
+        #date_given = valid_date("20221122")
+        date_today = datetime.date.today()
+        sun_set = test_location.sunset(date_today, "official")
+        self.assertIsInstance(sun_set, datetime.date)
+        
+    def test_sunset_22Nov2022(self):
+        "Test sunset calculation for 22 Nov 2022"
+        test_location = location(51.41416666, -1.515)
+        date_given = valid_date("20221122")
+        sun_set = test_location.sunset(date_given, "official")        
+        self.assertIsInstance(sun_set, datetime.date)
+        
+        #print(sun_set)
+        
+        # local_hour = 16, local_minute = 8, local_second = 55
+        self.assertEqual(sun_set.hour, 16)
+        self.assertEqual(sun_set.minute, 8)
+        self.assertEqual(sun_set.second, 55)        
+
+    def test_sun_events_22Nov2022(self):
+        "Test sun_events gives the same times as sunrise and sunset"
+        test_location = location(51.41416666, -1.515)
+        date_given = valid_date("20221122")
+        sun_rise, sun_set = test_location.sun_events(date_given, "official")
+        self.assertEqual(sun_rise, test_location.sunrise(date_given, "official"))
+        self.assertEqual(sun_set, test_location.sunset(date_given, "official"))
+
+    def test_refine_22Nov2022(self):
+        "Test refine moves the 22 Nov 2022 times by the few seconds expected"
+        test_location = location(51.41416666, -1.515)
+        date_given = valid_date("20221122")
+        # rising, refined time, how far refine moves it in seconds
+        for rising, hour, minute, second, shift in ((True, 7, 34, 50, 5.97), (False, 16, 9, 0, 5.25)):
+            usual = test_location.ss_calc(date_given, "official", rising)
+            refined = test_location.ss_calc(date_given, "official", rising, refine=True)
+            self.assertEqual((refined.hour, refined.minute, refined.second), (hour, minute, second))
+            self.assertAlmostEqual((refined - usual).total_seconds(), shift, places=2)
+
+    def test_step_by_step_matches(self):
+        "Test the step by step path used at verbose 3 gives the same times as the usual one"
+        quiet_location = location(51.41416666, -1.515, 0)
+        # Made quietly, then switched to verbose 3 with its output thrown away
+        chatty_location = location(51.41416666, -1.515, 0)
+        chatty_location.verbose = 3
+        dates = [datetime.date(2022, 1, 1) + datetime.timedelta(days=d) for d in range(0, 365, 30)]
+        for date_given in dates:
+            for zenith in ("official", "civil"):
+                for rising in (True, False):
+                    for refine in (False, True):
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            chatty = chatty_location.ss_calc(date_given, zenith, rising, refine)
+                        self.assertEqual(chatty, quiet_location.ss_calc(date_given, zenith, rising, refine))
+
+    def test_polar_night(self):
+        "Test the sun doesn't rise at 80 degrees north on 21 Dec"
+        test_location = location(80.0, 0.0, 0)
+        date_given = valid_date("20221221")
+        with self.assertRaises(PolarNightError):
+            test_location.sunrise(date_given, "official")
+        with self.assertRaises(PolarNightError):
+            test_location.sunset(date_given, "official")
+
+    def test_polar_day(self):
+        "Test the sun doesn't set at 80 degrees north on 21 Jun"
+        test_location = location(80.0, 0.0, 0)
+        date_given = valid_date("20220621")
+        with self.assertRaises(PolarDayError):
+            test_location.sunset(date_given, "official")
+
+    @unittest.skipIf(importlib.util.find_spec("numpy") is None, "numpy is not installed")
+    def test_vector_matches_scalar(self):
+        "Test the numpy path gives the same times as the date by date one"
+        test_location = location(51.41416666, -1.515, 0)
+        dates = [datetime.date(2022, 1, 1) + datetime.timedelta(days=d) for d in range(0, 365, 7)]
+        for zenith in ("official", "civil"):
+            self.assertEqual(test_location.sunrise(dates, zenith), [test_location.sunrise(d, zenith) for d in dates])
+            self.assertEqual(test_location.sunset(dates, zenith), [test_location.sunset(d, zenith) for d in dates])
+
+    @unittest.skipIf(importlib.util.find_spec("numpy") is None, "numpy is not installed")
+    def test_vector_single_datetime64(self):
+        "Test a single numpy.datetime64 gives a list of one time"
+        import numpy
+        test_location = location(51.41416666, -1.515, 0)
+        date_given = valid_date("20221122")
+        self.assertEqual(test_location.sunrise(numpy.datetime64("2022-11-22"), "official"), [test_location.sunrise(date_given, "official")])
+
+def suite():
+
+    # Add tests manually  
+    #suite = unittest.TestSuite()
+    #suite.addTest(testcases('test_valid_latitude'))
+    
+    # or use test discovery 
+    suite = unittest.defaultTestLoader.loadTestsFromTestCase(testcases)
+    return suite
+
+if __name__ == "__main__":
+    unittest.main()
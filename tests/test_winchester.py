@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#  test_winchester.py
+#
+#  Copyright 2022 Paul Ivinson <paivinson@gmail.com>
+#
+"""Unit tests for winchester.
+
+Run them with
+    python3 -m unittest
+from the top of the project.
+"""
+
+# Built-in Python modules
+import argparse
+import contextlib
+import datetime
+import io
+import unittest
+
+#---- our own modules ---------------------------------#
+import winchester
+
+#===============================================================#
+# define unit tests                                             #
+#===============================================================#
+
+def run_main(argv):
+    "Runs winchester.main(argv) and returns what it printed."
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        winchester.main(argv)
+    return(out.getvalue())
+
+class parsertests(unittest.TestCase):
+
+    def test_default_args(self):
+        "Test the defaults main() uses with no options are the ones the parser gives"
+        self.assertEqual(winchester._DEFAULT_ARGS, vars(winchester.make_parser().parse_args([])))
+
+    def test_bad_date_digits(self):
+        "Test a date must be written with the digits 0-9"
+        for date_str in ("202211 1", "+2022112", "2022112\u00b2", "\u0662\u0660\u0662\u0662\u0661\u0661\u0662\u0662"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                winchester.valid_date(date_str)
+        self.assertEqual(winchester.valid_date("20221122"), datetime.date(2022, 11, 22))
+
+class datetests(unittest.TestCase):
+
+    def test_date(self):
+        "Test the three lines printed for --date"
+        self.assertEqual(run_main(['-q', '--date', '20221122']).splitlines(),
+                         ["Sunrise in Winchester (UK) on 2022-11-22 is 07:32:30",
+                          "Sunset in Winchester (UK) on 2022-11-22 is 16:09:30",
+                          "Day length in Winchester (UK) on 2022-11-22 is 8:37:00"])
+
+class daterangetests(unittest.TestCase):
+
+    def test_range_inclusive(self):
+        "Test --date-range prints one line for each date, Start and End included"
+        lines = run_main(['-q', '--date-range', '20221120', '20221123']).splitlines()
+        self.assertEqual([line.split()[0] for line in lines], ['2022-11-20', '2022-11-21', '2022-11-22', '2022-11-23'])
+        # The same times as asking for the date on its own
+        self.assertIn('Sunrise 07:32:30 Sunset 16:09:30 Day length 8:37:00', lines[2])
+
+    def test_range_one_day(self):
+        "Test Start and End can be the same date"
+        lines = run_main(['-q', '--date-range', '20221122', '20221122']).splitlines()
+        self.assertEqual(len(lines), 1)
+
+    def test_range_to_last_date(self):
+        "Test a range can end on the last date there is"
+        lines = run_main(['-q', '--date-range', '99991230', '99991231']).splitlines()
+        self.assertEqual([line.split()[0] for line in lines], ['9999-12-30', '9999-12-31'])
+
+    def test_end_before_start(self):
+        "Test an End before Start is an error"
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as cm:
+            run_main(['-q', '--date-range', '20221123', '20221120'])
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('End is before Start', err.getvalue())
+
+    def test_date_and_range(self):
+        "Test --date and --date-range can't be used together"
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as cm:
+            run_main(['-q', '--date', '20221122', '--date-range', '20221120', '20221123'])
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('not allowed with argument', err.getvalue())
+
+    def test_range_polar(self):
+        "Test a date with no sunset gets its own line and the range carries on"
+        lines = run_main(['-q', '--zenith', 'astronomical', '--date-range', '20220620', '20220621']).splitlines()
+        self.assertEqual([line.split()[0] for line in lines], ['2022-06-20', '2022-06-21'])
+        for line in lines:
+            self.assertIn('never sets', line)
+        # Astronomical twilight at Winchester first ends again on 19 Jul
+        lines = run_main(['-q', '--zenith', 'astronomical', '--date-range', '20220718', '20220719']).splitlines()
+        self.assertIn('never sets', lines[0])
+        self.assertIn('Sunrise 00:21:37 Sunset 23:52:10', lines[1])
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(parsertests))
+    suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(datetests))
+    suite.addTests(unittest.defaultTestLoader.loadTestsFromTestCase(daterangetests))
+    return suite
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,9 @@ optional arguments:
                         because the behaviour isn't defined.
   --date Date           Date of sunrise & sunset in the format YYYYMMDD.
                         Defaults to today.
+  --date-range Start End
+                        Print sunrise & sunset for every date from Start to
+                        End inclusive, both in the format YYYYMMDD.
   --zenith Zenith       The zenith of the sun at sunrise and sunset.
 
   zenith should be one of the following
@@ -38,29 +41,42 @@ import sys
 import argparse
 import datetime
 import time
-import re
-import unittest
+import functools
 
 # Additional modules
-# we could do the following 
-# import dateutil.tz
-# but it makes usage rather messy i.e.
-# dateutil.tz.tz.tzutc()
-from dateutil import tz
+#- None at this time
 
 #---- our own modules ---------------------------------#
 import sunrise_sunset
 
 # Note the start time. Do this as soon as possible, even before the
 # various class and function definitions have been read.
-start_time = time.time()
+# perf_counter() is only good for measuring intervals, which is all the
+# messages need, but it is cheaper to read than the wall clock and never
+# goes backwards.
+start_time = time.perf_counter()
 
 #===============================================================#
 # Default values are here to allow this module to be imported.  #
 #===============================================================#
 verbose          = 1  # verbose = 1 gets you basic messages.
 debug            = False
-total_time       = 0.0
+
+# The start up messages, without their newlines. None of these change
+# while the program runs. __doc__ is None under python -OO.
+_BANNER     = (__doc__ or '').replace('\n', '')
+_PLATFORM   = sys.platform.replace('\n', '')
+_PY_VERSION = sys.version.replace('\n', '')
+
+# Winchester doesn't move, so its location is set up once, quietly, when
+# this module is loaded. main() only has to set how chatty it is.
+_WINCHESTER_LATITUDE  = 51.0632
+_WINCHESTER_LONGITUDE = -1.308
+_WINCHESTER_LOC = sunrise_sunset.location(_WINCHESTER_LATITUDE, _WINCHESTER_LONGITUDE, 0)
+
+# What make_parser() gives when there are no options. main() uses these
+# to skip building the parser; tests/test_winchester.py checks they agree.
+_DEFAULT_ARGS = {'verbose': 1, 'Date': None, 'DateRange': None, 'Zenith': 'official'}
     
 #===============================================================#
 # define Exceptions                                             #
@@ -80,11 +96,14 @@ total_time       = 0.0
 # Utility functions ============================================#
 def message(verbosity, msg, module=__name__):
     global verbose, start_time
+    if verbosity > verbose:
+        # Not wanted at this level, so don't read the clock or format anything.
+        return
     if verbosity == 0 and verbose == 0:
         # Cleaner messages when in quiet mode
         print(msg)
-    elif verbosity <= verbose:
-        print("---- %4.4f %s - %s" % ((time.time()-start_time), module, msg))
+    else:
+        print("---- %4.4f %s - %s" % ((time.perf_counter()-start_time), module, msg))
     return
 
 def is_number(s):
@@ -96,16 +115,10 @@ def is_number(s):
     except TypeError:
         return False
 
-def is_integer(s):
-    try:
-        int(s)
-        return True
-    except ValueError:
-        return False
-    except TypeError:
-        return False
-
 #==== Used by the argument parsing =====================================
+# datetime.date is immutable so the same one can be handed out for the
+# same string. Errors aren't cached; they are raised again each time.
+@functools.lru_cache(maxsize=128)
 def valid_date(date_str):
     "Validates a date in the format YYYYMMDD, Returns a datetime.date object"
 
@@ -114,8 +127,10 @@ def valid_date(date_str):
         msg = 'valid_date - Error validating date. Wrong number of characters. Date="%s"' % date_str
         raise argparse.ArgumentTypeError(msg)
 
-    # is the supplied date all digits?
-    if not is_integer(date_str):
+    # is the supplied date all digits 0-9? int() would also let through
+    # spaces and a sign e.g. "202211 1" or "+2022112", and isdigit() on
+    # its own other scripts' digits and superscripts e.g. "2022112²"
+    if not (date_str.isascii() and date_str.isdigit()):
         msg = 'valid_date - Error validating date. Format not YYYYMMDD Date="%s"' % date_str
         raise argparse.ArgumentTypeError(msg)
 
@@ -151,14 +166,14 @@ def valid_date(date_str):
 # None so far
 
 #===============================================================#
-# define main()                                                 #
+# define the argument parser                                    #
 #===============================================================#
-def main():
-    global verbose
+# Built the first time it is needed and then kept, so calling main()
+# again, e.g. from another script, doesn't set it all up again.
+@functools.lru_cache(maxsize=None)
+def make_parser():
+    "Returns the ArgumentParser for the command line options."
 
-    #==================================================================#
-    # Parse arguments                                                  #
-    #==================================================================#
     parser = argparse.ArgumentParser(
         description=__doc__,
         # Take control of the formatting of the epilog
@@ -173,6 +188,14 @@ def main():
         """,
         add_help=True)
 
+    if sys.version_info >= (3, 14):
+        # From Python 3.14 each add_argument() makes HelpFormatters just to
+        # check the argument, and each one reads the environment to decide
+        # on colour. Let them all share one formatter while the arguments
+        # are added.
+        formatter = parser._get_formatter()
+        parser._get_formatter = lambda: formatter
+
     # First argument to be processed is ..
     parser.add_argument('-q',              dest='verbose',  action='store_const', const=0, default=1, help="Quiet - absolutely no messages. Useful from the command line. Make this the first option or you will get messages as the other options are processed.")
     
@@ -181,38 +204,66 @@ def main():
 
     # Optional args
     parser.add_argument('-v', '--verbose', dest='verbose',  action='count',                default=1, help="Verbose - extra messages. Don't use -v and -q together because the behaviour isn't defined.")
-    parser.add_argument('--date',          dest='Date',     metavar='Date', type=valid_date, help='Date of sunrise & sunset in the format YYYYMMDD.')
+    # One date or a range of them, not both
+    dates = parser.add_mutually_exclusive_group()
+    dates.add_argument('--date',           dest='Date',     metavar='Date', type=valid_date, help='Date of sunrise & sunset in the format YYYYMMDD.')
+    dates.add_argument('--date-range',     dest='DateRange', metavar=('Start', 'End'), nargs=2, type=valid_date, help='Print sunrise & sunset for every date from Start to End inclusive, both in the format YYYYMMDD.')
     parser.add_argument('--zenith',        dest='Zenith',   metavar='Zenith', choices=['official', 'civil', 'nautical', 'astronomical'], default='official', help='The zenith of the sun at sunrise and sunset.')
 
+    if sys.version_info >= (3, 14):
+        # Back to a fresh formatter each time, which --help and the error
+        # messages rely on.
+        del parser._get_formatter
+
+    return(parser)
+
+#===============================================================#
+# define main()                                                 #
+#===============================================================#
+def main(argv=None):
+    """ Run from the command line.
+        argv: list of option strings - defaults to sys.argv[1:]
+    """
+    global verbose
+
+    #==================================================================#
+    # Parse arguments                                                  #
+    #==================================================================#
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if argv:
+        parser = make_parser()
+        args = vars(parser.parse_args(argv))
+        
+        if args['DateRange'] is not None and args['DateRange'][1] < args['DateRange'][0]:
+            parser.error("argument --date-range: End is before Start")
+    else:
+        # With no options there is nothing for argparse to do, so don't
+        # build the parser. These are the defaults it would give.
+        args = dict(_DEFAULT_ARGS)
+
     this_script = os.path.basename(sys.argv[0])
 
-    args = vars(parser.parse_args())
-
-    for key in args.keys():
-        o = key
-        a = args[key]
-        # Standard options
-        if o == 'v': verbose = a
-        if o == 'q': verbose = 0
-        #if o == 'h': usage()
-        #if o == 'help': usage()
-        if o == 'verbose': verbose = a
-        # Now print the option - if -q then message will be suppressed
-        message (1, 'Option %s = %s' %(o,a))
-        # Options specific to this script
-        if o == 'Date': date_given = a
-        if o == 'Zenith': zenith = a
+    # -q and -v both store to verbose, so argparse has already settled
+    # which of them wins.
+    verbose    = args['verbose']
+    date_given = args['Date']
+    date_range = args['DateRange']
+    zenith     = args['Zenith']
+    # Print the options - if -q then message will be suppressed
+    message(1, 'Options: %r' % args)
         
-    message(1, "%s" % re.sub(r'\n', '', __doc__))
+    message(1, _BANNER)
     message(1, "Started %s" % time.strftime("%a, %d %b %Y %H:%M:%S"))
-    message(1, "Python interpreter running on %s" % re.sub(r'\n', '', sys.platform))
-    message(1, "Interpreter version = %s" % re.sub(r'\n', '', sys.version))
+    message(1, "Python interpreter running on %s" % _PLATFORM)
+    message(1, "Interpreter version = %s" % _PY_VERSION)
     message(1, "Invoked via %s" % sys.argv[0])        
         
-    if sys.platform.lower()[0:5] == 'linux':
+    # sys.platform is always lower case e.g. 'linux', 'cygwin', 'win32'
+    if sys.platform.startswith('linux'):
         message(1, '%s - Running on Linux.' % this_script)
-
-    if sys.platform.lower()[0:6] == 'cygwin':
+    elif sys.platform.startswith('cygwin'):
         message(1, '%s - Running on Cygwin.' % this_script)
 
     message(1,'%s - Verbose level = %s' % (this_script, verbose))
@@ -221,14 +272,8 @@ def main():
     #===============================================================#
     # Start work                                                    #
     #===============================================================#
-    # Preserve the incoming argv set
-    master_argv = sys.argv
-
-    winchester_latitude  = 51.0632
-    winchester_longitude = -1.308
-    
     today = False
-    if not date_given:
+    if date_given is None:
         date_given = datetime.date.today()
         today = True
         
@@ -236,33 +281,51 @@ def main():
     if ss_verbose < 0: 
         ss_verbose = 0
 
-    winchester_location = sunrise_sunset.location(winchester_latitude, winchester_longitude, ss_verbose)
-    sunrise = winchester_location.sunrise(date_given, zenith)
-    sunset = winchester_location.sunset(date_given, zenith)
-    day_length = sunset - sunrise 
+    winchester_location = _WINCHESTER_LOC
+    winchester_location.verbose = ss_verbose
+    
+    #=== DATE RANGE ================================================#
+    # The location is only set up once however many dates there are,
+    # and the whole range is done in this one run of the script.
+    if date_range is not None:
+        first_day, last_day = date_range
+        # Count the days rather than step past last_day, which would go
+        # beyond datetime.date.max for a range ending on 9999-12-31.
+        for n in range((last_day - first_day).days + 1):
+            day = first_day + datetime.timedelta(days=n)
+            try:
+                sunrise, sunset = winchester_location.sun_events(day, zenith)
+            except (sunrise_sunset.PolarNightError, sunrise_sunset.PolarDayError) as e:
+                message(0, "%s %s" % (day.strftime("%Y-%m-%d"), e))
+            else:
+                day_length = sunset.replace(microsecond=0) - sunrise.replace(microsecond=0)
+                message(0, "%s Sunrise %s Sunset %s Day length %s" % (day.strftime("%Y-%m-%d"), sunrise.strftime("%H:%M:%S"), sunset.strftime("%H:%M:%S"), day_length))
+        message(1, "Finished!")
+        return(errors)
+    
+    try:
+        sunrise, sunset = winchester_location.sun_events(date_given, zenith)
+    except (sunrise_sunset.PolarNightError, sunrise_sunset.PolarDayError) as e:
+        # e.g. astronomical twilight lasts all night in midsummer
+        message(0, str(e))
+        return(errors)
+    # The times carry microseconds; the day length is shown to the second.
+    day_length = sunset.replace(microsecond=0) - sunrise.replace(microsecond=0)
     
+    # Print the three lines together, in one write.
     if today:
-        message(0, "Sunrise in Winchester (UK) today is %i:%02i:%02i" % (sunrise.hour, sunrise.minute, sunrise.second))
-        message(0, "Sunset in Winchester (UK) today is %i:%02i:%02i" % (sunset.hour, sunset.minute, sunset.second))
-        message(0, "Day length in Winchester (UK) today is %s" % day_length)
+        lines = ["Sunrise in Winchester (UK) today is %s" % sunrise.strftime("%H:%M:%S"),
+                 "Sunset in Winchester (UK) today is %s" % sunset.strftime("%H:%M:%S"),
+                 "Day length in Winchester (UK) today is %s" % day_length]
     else:
-        message(0, "Sunrise in Winchester (UK) on %i-%02i-%02i is %i:%02i:%02i" % (sunrise.year, sunrise.month, sunrise.day, sunrise.hour, sunrise.minute, sunrise.second))
-        message(0, "Sunset in Winchester (UK) on %i-%02i-%02i is %i:%02i:%02i" % (sunset.year, sunset.month, sunset.day, sunset.hour, sunset.minute, sunset.second))
-        message(0, "Day length in Winchester (UK) on %i-%02i-%02i is %s" % (sunset.year, sunset.month, sunset.day, day_length))
+        lines = ["Sunrise in Winchester (UK) on %s is %s" % (sunrise.strftime("%Y-%m-%d"), sunrise.strftime("%H:%M:%S")),
+                 "Sunset in Winchester (UK) on %s is %s" % (sunset.strftime("%Y-%m-%d"), sunset.strftime("%H:%M:%S")),
+                 "Day length in Winchester (UK) on %s is %s" % (date_given.strftime("%Y-%m-%d"), day_length)]
+    message(0, '\n'.join(lines))
                 
     message(1, "Finished!")
     return(errors)
 
-#=====================================================================#
-# Help text and utilities                                             #
-#=====================================================================#
-
-def usage(*args):
-    sys.stdout = sys.stderr
-    for msg in args: print(msg)
-    print(__doc__)
-    sys.exit(2)
-
 #=====================================================================#
 #                      Main program                                   #
 #=====================================================================#